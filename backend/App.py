@@ -1,9 +1,17 @@
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+import retrieval
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # Kick off the index load without blocking uvicorn from accepting connections
+    retrieval.start_loading()
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
-# CORS middleware
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -12,36 +20,45 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from chat_history_files import (
     load_history_from_s3, save_history_to_s3,
     list_conversations, get_conversation, add_conversation, add_message_to_conversation, delete_conversation
 )
-import openai
-import faiss
-import numpy as np
-import json
 import os
 from dotenv import load_dotenv
 load_dotenv()
-# Load models and metadata at startup
+# openai, faiss and numpy are imported where they are used (or by the
+# background loader) to keep import time low
 EMBEDDING_MODEL = "text-embedding-3-large"
 GPT_MODEL = "gpt-4o"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-index = faiss.read_index("vector_index.faiss")
-with open("metadata.json", "r", encoding="utf-8") as f:
-    metadata = json.load(f)
-index = faiss.read_index("vector_index.faiss")
-with open("metadata.json", "r", encoding="utf-8") as f:
-    metadata = json.load(f)
+# "background" loads the index after startup, "eager" loads it at import time
+STARTUP_MODE = os.getenv("STARTUP_MODE", "background")
+if STARTUP_MODE == "eager":
+    retrieval.start_loading(background=False)
+
 
 
+class Scope(BaseModel):
+    """Restricts retrieval to a slice of the corpus; all given filters must match."""
+    categories: Optional[List[str]] = None
+    source_files: Optional[List[str]] = None
+    page_min: Optional[int] = None
+    page_max: Optional[int] = None
 
 class ChatRequest(BaseModel):
     user_input: str
     email: str
     convo_id: str = None
     enhance_context: bool = False
+    scope: Optional[Scope] = None
+
+class SearchRequest(BaseModel):
+    query: str
+    top_k: int = Field(10, ge=1, le=100)
+    scope: Optional[Scope] = None
 
 class NewConvoRequest(BaseModel):
     email: str
@@ -51,6 +68,18 @@ class ConvoRequest(BaseModel):
     email: str
     convo_id: str
 
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    retrieval.start_loading()
+    status = retrieval.get_status()
+    if status["state"] != "ready":
+        return JSONResponse(status_code=503, content=status)
+    return status
+
 @app.get("/conversations")
 def get_convos(email: str):
     return list_conversations(email)
@@ -68,13 +97,45 @@ def get_convo(email: str, convo_id: str):
     return {"error": "Conversation not found"}
 
 def get_embedding(text):
+    import openai
+    import numpy as np
     response = openai.embeddings.create(model=EMBEDDING_MODEL, input=[text])
     return np.array(response.data[0].embedding).astype("float32")
 
-def retrieve_chunks(question, top_k=10):
+def check_retrieval(scope=None):
+    """Fail fast, before any OpenAI call or history write, if retrieval can't serve this scope."""
+    if not retrieval.wait_until_ready():
+        raise HTTPException(status_code=503, detail="Retrieval index is not ready")
+    if scope is not None:
+        try:
+            retrieval.validate_scope(scope.categories, scope.source_files)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+def retrieve_chunks(question, top_k=10, scope=None):
+    check_retrieval(scope)
     query_vector = get_embedding(question)
-    D, I = index.search(np.array([query_vector]), top_k)
-    return [metadata[i] for i in I[0] if i < len(metadata)]
+    if scope is None:
+        return retrieval.search(query_vector, top_k)
+    return retrieval.search(
+        query_vector, top_k,
+        categories=scope.categories,
+        source_files=scope.source_files,
+        page_min=scope.page_min,
+        page_max=scope.page_max
+    )
+
+@app.post("/search")
+def search_endpoint(req: SearchRequest):
+    """Raw chunk retrieval, optionally scoped, for the tool pages."""
+    chunks = retrieve_chunks(req.query, top_k=req.top_k, scope=req.scope)
+    return {"chunks": chunks}
+
+@app.get("/search/scopes")
+def search_scopes():
+    if not retrieval.wait_until_ready():
+        raise HTTPException(status_code=503, detail="Retrieval index is not ready")
+    return retrieval.get_scopes()
 
 def rerank_with_gpt(question, chunks, top_n=4):
     return chunks[:top_n]
@@ -96,6 +157,7 @@ def detect_language(text):
 
 def generate_conversation_title(first_question):
     """Generate a conversation title from the first user question."""
+    import openai
     try:
         response = openai.chat.completions.create(
             model=GPT_MODEL,
@@ -117,6 +179,7 @@ def generate_conversation_title(first_question):
         return first_question[:30] if first_question else "New Chat"
 
 def generate_answer(context, question, conversation_context):
+    import openai
     previous = "\n".join([f"User: {turn['user']}\nAI: {turn['ai']}" for turn in conversation_context[-6:]])  # Increased from 3 to 6 for better memory
     # Detect the language of the user's question
     detected_language = detect_language(question)
@@ -167,6 +230,7 @@ Current Question (respond in the SAME language as this question):
 
 def enhance_answer_with_context(initial_answer, question, detected_language):
     """Enhance the initial answer with additional context for vague terms."""
+    import openai
     system_message = f"""You MUST respond in {detected_language} only. Do not use any other language. Provide specific, detailed information related to the user's question.
 
 Based on the user's specific question, provide detailed additional context that directly relates to what they asked. Focus on:
@@ -219,6 +283,7 @@ def generate_enhanced_answer(context, question, conversation_context, enhance_co
     return initial_answer
 
 def generate_follow_up(previous_question, previous_answer, current_question, current_answer):
+    import openai
     if "no details found." not in current_answer.lower():
         return ""
     
@@ -247,7 +312,6 @@ Suggest a clarifying follow-up question to help the user get better information.
         print(f"Follow-up generation error: {e}")
         return ""
 
-import boto3
 from urllib.parse import quote_plus
 AWS_REGION = "eu-central-2"
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
@@ -272,6 +336,7 @@ def chat_endpoint(req: ChatRequest):
     username = req.email
     user_input = req.user_input
     convo_id = req.convo_id
+    check_retrieval(req.scope)
 
     # Load chat history
     history = load_history_from_s3(username)
@@ -294,7 +359,7 @@ def chat_endpoint(req: ChatRequest):
             conversation_context = convo["messages"][-6:] if convo["messages"] else []  # Increased from 3 to 6 for better memory
 
     # Retrieve and rerank
-    top_chunks = retrieve_chunks(user_input, top_k=10)
+    top_chunks = retrieve_chunks(user_input, top_k=10, scope=req.scope)
     reranked_chunks = rerank_with_gpt(user_input, top_chunks, top_n=4)
     seen = set()
     unique_citations = []
@@ -340,6 +405,7 @@ def enhance_context_endpoint(req: ChatRequest):
     """Separate endpoint to get enhanced context on-demand."""
     username = req.email
     user_input = req.user_input
+    check_retrieval(req.scope)
     
     # Get conversation context
     conversation_context = []
@@ -349,7 +415,7 @@ def enhance_context_endpoint(req: ChatRequest):
             conversation_context = convo["messages"]
     
     # Get basic answer first
-    chunks = retrieve_chunks(user_input)
+    chunks = retrieve_chunks(user_input, scope=req.scope)
     reranked_chunks = rerank_with_gpt(user_input, chunks)
     context = build_context(reranked_chunks)
     
@@ -0,0 +1,82 @@
+# bench_rebuild.py
+
+"""Benchmark a full-corpus rebuild up to (but not including) embeddings.
+
+Usage:
+    python bench_rebuild.py              # re-chunk from the page cache
+    python bench_rebuild.py --s3         # also time the S3 pass that fills the cache
+
+Run --s3 against an empty page cache to measure the old download + pypdf path.
+"""
+
+import time
+import argparse
+
+import page_cache
+from ingest_files_from_s3 import (
+    PAGE_CACHE_DIR, CHUNK_SIZE, CHUNK_OVERLAP,
+    make_splitter, chunk_texts, iter_s3_documents
+)
+
+
+def time_s3_pass():
+    start = time.perf_counter()
+    pages = sum(len(p) for _, p in iter_s3_documents())
+    return time.perf_counter() - start, pages
+
+
+def time_chunking(documents, chunker, chunk_size, chunk_overlap, repeat):
+    splitter = make_splitter(chunker, chunk_size, chunk_overlap)
+    best = float("inf")
+    chunks = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = []
+        for source_file, pages in documents:
+            chunks.extend(chunk_texts(pages, source_file, splitter))
+        best = min(best, time.perf_counter() - start)
+    return best, chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full-corpus rebuild time.")
+    parser.add_argument("--s3", action="store_true", help="time the S3 listing/download/extraction pass first")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--chunk-overlap", type=int, default=CHUNK_OVERLAP)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.s3:
+        elapsed, pages = time_s3_pass()
+        print(f"S3 pass (first)          : {elapsed:8.3f}s ({pages} pages)")
+        elapsed, pages = time_s3_pass()
+        print(f"S3 pass (cache warm)     : {elapsed:8.3f}s ({pages} pages)")
+
+    start = time.perf_counter()
+    documents = list(page_cache.iter_cached_documents(PAGE_CACHE_DIR))
+    load_time = time.perf_counter() - start
+    pages = sum(len(p) for _, p in documents)
+    chars = sum(len(t) for _, p in documents for _, t in p)
+    print(f"Page cache load          : {load_time:8.3f}s ({len(documents)} files, {pages} pages, {chars} chars)")
+    if not documents:
+        print("❌ Page cache is empty. Run ingest_files_from_s3.py (or this script with --s3) first.")
+        return
+
+    native_time, native_chunks = time_chunking(documents, "native", args.chunk_size, args.chunk_overlap, args.repeat)
+    print(f"Chunking (native)        : {native_time:8.3f}s ({len(native_chunks)} chunks)")
+
+    try:
+        langchain_time, langchain_chunks = time_chunking(
+            documents, "langchain", args.chunk_size, args.chunk_overlap, args.repeat
+        )
+    except ImportError:
+        print("Chunking (langchain)     : skipped, langchain is not installed")
+        return
+    print(f"Chunking (langchain)     : {langchain_time:8.3f}s ({len(langchain_chunks)} chunks)")
+    print(f"Speedup                  : {langchain_time / native_time:8.2f}x")
+    identical = [c["text"] for c in native_chunks] == [c["text"] for c in langchain_chunks]
+    print(f"Identical output         : {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# bench_scoped_search.py
+
+"""Compare scoped search latency with full-corpus search followed by post-filtering.
+
+Query vectors are stored chunk vectors plus a little noise, so no OpenAI calls
+are needed.
+
+Run from the backend directory (needs vector_index.faiss and metadata.json):
+    python bench_scoped_search.py --queries 200
+"""
+
+import time
+import argparse
+
+import numpy as np
+
+import retrieval
+
+
+def post_filter_search(query_vector, top_k, categories=None, source_files=None, page_min=None, page_max=None):
+    """The unscoped baseline: rank the whole corpus, then drop chunks outside the scope."""
+    D, I = retrieval.index.search(np.array([query_vector], dtype="float32"), retrieval.index.ntotal)
+    results = []
+    for i in I[0]:
+        chunk = retrieval.metadata[i]
+        if categories and chunk["category"] not in categories:
+            continue
+        if source_files and chunk["source_file"] not in source_files:
+            continue
+        if page_min is not None and chunk["page"] < page_min:
+            continue
+        if page_max is not None and chunk["page"] > page_max:
+            continue
+        results.append(chunk)
+        if len(results) == top_k:
+            break
+    return results
+
+
+def build_scopes():
+    scopes = {}
+    available = retrieval.get_scopes()
+    for category, count in available["categories"].items():
+        if count:
+            scopes[f"category={category}"] = {"categories": [category]}
+    source_files = sorted(available["source_files"], key=available["source_files"].get)
+    scopes[f"source={source_files[0]}"] = {"source_files": [source_files[0]]}
+    scopes[f"source={source_files[-1]}"] = {"source_files": [source_files[-1]]}
+    scopes["pages 1-2"] = {"page_min": 1, "page_max": 2}
+    return scopes
+
+
+def time_queries(search, queries, top_k, scope):
+    start = time.perf_counter()
+    results = [search(q, top_k, **scope) for q in queries]
+    return (time.perf_counter() - start) / len(queries) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scoped retrieval.")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    retrieval.start_loading(background=False)
+    if not retrieval.is_ready():
+        print(f"❌ Retrieval failed to load: {retrieval.get_status()['error']}")
+        return
+
+    rng = np.random.default_rng(0)
+    vectors = retrieval.index.reconstruct_n(0, retrieval.index.ntotal)
+    picks = rng.integers(0, len(vectors), args.queries)
+    queries = vectors[picks] + rng.normal(0, 0.01, (args.queries, vectors.shape[1])).astype("float32")
+
+    print(f"{retrieval.index.ntotal} chunks, {args.queries} queries, top_k={args.top_k}")
+    print(f"{'scope':50} {'scoped ms':>10} {'post-filter ms':>15} {'same':>5}")
+    full_ms, _ = time_queries(retrieval.search, queries, args.top_k, {})
+    print(f"{'(full corpus)':50} {full_ms:10.3f} {'':>15} {'':>5}")
+    for name, scope in build_scopes().items():
+        scoped_ms, scoped = time_queries(retrieval.search, queries, args.top_k, scope)
+        post_ms, post = time_queries(post_filter_search, queries, args.top_k, scope)
+        same = all(
+            [id(c) for c in a] == [id(c) for c in b]
+            for a, b in zip(scoped, post)
+        )
+        print(f"{name[:50]:50} {scoped_ms:10.3f} {post_ms:15.3f} {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
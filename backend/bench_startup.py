@@ -0,0 +1,43 @@
+# bench_startup.py
+
+"""Benchmark API cold start: App import time and index load/prewarm time.
+
+Run from the backend directory in a fresh interpreter:
+    python bench_startup.py                 # background loading (default)
+    python bench_startup.py --mode eager    # old behaviour, load during import
+"""
+
+import os
+import sys
+import time
+import argparse
+
+HEAVY_MODULES = ["faiss", "openai", "boto3", "numpy"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API cold start.")
+    parser.add_argument("--mode", choices=["background", "eager"], default="background")
+    args = parser.parse_args()
+    os.environ["STARTUP_MODE"] = args.mode
+
+    start = time.perf_counter()
+    import App
+    import_time = time.perf_counter() - start
+    loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+    print(f"Import App               : {import_time:8.3f}s (heavy modules loaded: {', '.join(loaded) or 'none'})")
+
+    App.retrieval.start_loading()
+    ready = App.retrieval.wait_until_ready()
+    total = time.perf_counter() - start
+    status = App.retrieval.get_status()
+    if not ready:
+        print(f"❌ Retrieval failed to load: {status['error']}")
+        return
+    print(f"Index + metadata load    : {status['load_seconds']:8.3f}s")
+    print(f"Prewarm                  : {status['prewarm_seconds']:8.3f}s")
+    print(f"Import to ready          : {total:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
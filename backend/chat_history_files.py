@@ -1,6 +1,5 @@
 # s3_chat_history.py
 
-import boto3
 import json
 import os
 from botocore.exceptions import NoCredentialsError, PartialCredentialsError,ClientError
@@ -15,15 +14,24 @@ AWS_SECRET_ACCESS_KEY=os.getenv("AWS_SECRET_ACCESS_KEY")
 BUCKET_NAME = "vector-input-files-bucket"
 CHAT_FOLDER = "Chat_History_Files"  # S3 folder
 
-# Initialize S3 client (you can also use environment variables or Streamlit secrets)
+# S3 client is created on first use so importing this module stays cheap
+# (you can also use environment variables or Streamlit secrets)
 
-s3 = boto3.client("s3", region_name=AWS_REGION)
+_s3 = None
+
+def get_s3_client():
+    global _s3
+    if _s3 is None:
+        import boto3
+        _s3 = boto3.client("s3", region_name=AWS_REGION)
+    return _s3
 
 def get_history_key(username):
     return f"{CHAT_FOLDER}/chat_history_{username}.json"
 
 def load_history_from_s3(username):
     key = get_history_key(username)
+    s3 = get_s3_client()
     try:
         response = s3.get_object(Bucket=BUCKET_NAME, Key=get_history_key(username))
         data = json.loads(response['Body'].read().decode('utf-8'))
@@ -43,7 +51,7 @@ def load_history_from_s3(username):
 
 def save_history_to_s3(username, history):
     try:
-        s3.put_object(
+        get_s3_client().put_object(
             Bucket=BUCKET_NAME,
             Key=get_history_key(username),
             Body=json.dumps(history, ensure_ascii=False, indent=2).encode("utf-8"),
@@ -106,6 +114,7 @@ def delete_conversation(username, convo_id):
 
 def check_connection(bucket_name):
     try:
+        import boto3
         s3=boto3.client("s3")
         print(f"Connection Successful '{bucket_name}'")
     except NoCredentialsError:
@@ -1,6 +1,7 @@
 import os
 import re
 import json
+import argparse
 import tempfile
 import faiss
 import numpy as np
@@ -8,7 +9,9 @@ from tqdm import tqdm
 from pypdf import PdfReader
 import boto3
 from openai import OpenAI
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from text_chunker import NativeTextSplitter, DEFAULT_SEPARATORS
+import page_cache
+from retrieval import categorize_source
 
 # ------------------ CONFIG ------------------
 
@@ -17,9 +20,11 @@ BUCKET_NAME = "vector-input-files-bucket"
 FOLDER_PREFIX = "Input Data/"  # S3 folder
 LOCAL_FAISS_FILE = "../vector_index.faiss"
 LOCAL_METADATA_FILE = "../metadata.json"
+PAGE_CACHE_DIR = "../page_cache"
 EMBEDDING_MODEL = "text-embedding-3-large"
 CHUNK_SIZE = 500
 CHUNK_OVERLAP = 150
+CHUNKER = "native"  # "native" or "langchain"; both produce the same chunks
 
 openai_client = os.getenv("openai_key")  # Replace securely
 
@@ -27,9 +32,9 @@ s3 = boto3.client("s3", region_name=AWS_REGION)
 
 # ------------------ HELPERS ------------------
 
-def list_pdf_keys(bucket, prefix):
+def list_pdf_objects(bucket, prefix):
     response = s3.list_objects_v2(Bucket=bucket, Prefix=prefix)
-    return [obj["Key"] for obj in response.get("Contents", []) if obj["Key"].endswith(".pdf")]
+    return [(obj["Key"], obj.get("ETag")) for obj in response.get("Contents", []) if obj["Key"].endswith(".pdf")]
 
 def download_pdf(key):
     with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
@@ -48,12 +53,62 @@ def extract_clean_text(path):
             results.append((page_num + 1, text))
     return results
 
-def chunk_texts(page_texts, source_file):
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP,
-        separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
-    )
+def get_cached_pages(key, etag, manifest):
+    """Return cleaned pages for an S3 PDF, downloading and extracting only on a cache miss."""
+    entry = manifest.get(key)
+    if entry and not entry.get("stale") and etag and entry.get("etag") == etag:
+        pages = page_cache.load_pages(PAGE_CACHE_DIR, entry["sha256"])
+        if pages is not None:
+            return pages
+
+    local_path = download_pdf(key)
+    try:
+        content_hash = page_cache.hash_file(local_path)
+        pages = page_cache.load_pages(PAGE_CACHE_DIR, content_hash)
+        if pages is None:
+            pages = extract_clean_text(local_path)
+            page_cache.save_pages(PAGE_CACHE_DIR, content_hash, pages)
+    finally:
+        os.remove(local_path)
+
+    manifest[key] = {"etag": etag, "sha256": content_hash, "source_file": key.split("/")[-1]}
+    return pages
+
+def iter_s3_documents():
+    """Yield (source_file, pages) for every PDF in S3, refreshing the page cache as needed."""
+    manifest = page_cache.load_manifest(PAGE_CACHE_DIR)
+    pdf_objects = list_pdf_objects(BUCKET_NAME, FOLDER_PREFIX)
+    # Forget PDFs that were deleted or renamed in S3 so --from-cache builds the same corpus
+    current_keys = {key for key, _ in pdf_objects}
+    for key in [key for key in manifest if key not in current_keys]:
+        print(f"🗑️ Dropping {key} from the page cache (no longer in S3)")
+        del manifest[key]
+    for key, etag in tqdm(pdf_objects, desc="⬇️ Downloading + Extracting PDFs"):
+        try:
+            yield key.split("/")[-1], get_cached_pages(key, etag, manifest)
+        except Exception as e:
+            print(f"⚠️ Skipped {key}: {e}")
+            # The cached text may belong to an older version of this PDF
+            if key in manifest:
+                manifest[key]["stale"] = True
+    page_cache.save_manifest(PAGE_CACHE_DIR, manifest)
+    page_cache.prune_artifacts(PAGE_CACHE_DIR, manifest)
+
+def make_splitter(chunker=CHUNKER, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP):
+    if chunker == "native":
+        return NativeTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=DEFAULT_SEPARATORS)
+    if chunker == "langchain":
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        return RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=DEFAULT_SEPARATORS
+        )
+    raise ValueError(f"Unknown chunker: {chunker}")
+
+def chunk_texts(page_texts, source_file, splitter=None):
+    splitter = splitter or make_splitter()
+    category = categorize_source(source_file)
     chunks = []
     for page_num, page_text in page_texts:
         texts = splitter.split_text(page_text)
@@ -62,6 +117,7 @@ def chunk_texts(page_texts, source_file):
                 "text": chunk,
                 "metadata": {
                     "source_file": source_file,
+                    "category": category,
                     "page": page_num,
                     "chunk_index": i,
                     "length": len(chunk),
@@ -80,25 +136,19 @@ def embed_texts(texts):
 
 # ------------------ MAIN ------------------
 
-def main():
+def main(from_cache=False, chunker=CHUNKER, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, chunk_only=False):
     all_chunks = []
-    temp_files = []
-
-    print("📦 Listing PDFs in S3...")
-    pdf_keys = list_pdf_keys(BUCKET_NAME, FOLDER_PREFIX)
-
-    for key in tqdm(pdf_keys, desc="⬇️ Downloading + Chunking PDFs"):
-        try:
-            file_name = key.split("/")[-1]
-            local_path = download_pdf(key)
-            temp_files.append(local_path)
+    splitter = make_splitter(chunker, chunk_size, chunk_overlap)
 
-            pages = extract_clean_text(local_path)
-            chunks = chunk_texts(pages, file_name)
-            all_chunks.extend(chunks)
+    if from_cache:
+        print(f"📂 Loading cached page text from {PAGE_CACHE_DIR}...")
+        documents = page_cache.iter_cached_documents(PAGE_CACHE_DIR)
+    else:
+        print("📦 Listing PDFs in S3...")
+        documents = iter_s3_documents()
 
-        except Exception as e:
-            print(f"⚠️ Skipped {key}: {e}")
+    for file_name, pages in documents:
+        all_chunks.extend(chunk_texts(pages, file_name, splitter))
 
     if not all_chunks:
         print("❌ No chunks found. Exiting.")
@@ -108,6 +158,8 @@ def main():
     metadata = [c["metadata"] for c in all_chunks]
 
     print(f"🔢 Total chunks: {len(texts)}")
+    if chunk_only:
+        return
     print("🔗 Generating embeddings...")
 
     vectors = embed_texts(texts)
@@ -122,9 +174,12 @@ def main():
 
     print(f"✅ Saved:\n  {LOCAL_FAISS_FILE}\n  {LOCAL_METADATA_FILE}")
 
-    for path in temp_files:
-        os.remove(path)
-    print("🧹 Deleted temporary PDF files.")
-
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Build the FAISS index from the PDFs in S3.")
+    parser.add_argument("--from-cache", action="store_true", help="re-chunk from the local page cache without S3 or pypdf")
+    parser.add_argument("--chunker", choices=["native", "langchain"], default=CHUNKER)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--chunk-overlap", type=int, default=CHUNK_OVERLAP)
+    parser.add_argument("--chunk-only", action="store_true", help="stop after chunking, skip embeddings and index write")
+    args = parser.parse_args()
+    main(args.from_cache, args.chunker, args.chunk_size, args.chunk_overlap, args.chunk_only)
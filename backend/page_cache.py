@@ -0,0 +1,88 @@
+# page_cache.py
+
+"""Content-hash keyed cache of cleaned per-page PDF text.
+
+Each PDF's cleaned pages are stored once as ``<sha256>.json.gz`` and a small
+manifest maps S3 keys to those artifacts, so re-chunking can run entirely from
+disk without S3 or pypdf.
+"""
+
+import os
+import gzip
+import json
+import hashlib
+
+# Bump when extract_clean_text changes so stale artifacts are re-extracted
+EXTRACT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def artifact_path(cache_dir, content_hash):
+    return os.path.join(cache_dir, f"{content_hash}.json.gz")
+
+
+def load_pages(cache_dir, content_hash):
+    path = artifact_path(cache_dir, content_hash)
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, OSError, EOFError, ValueError):
+        return None
+    if data.get("extract_version") != EXTRACT_VERSION:
+        return None
+    return [(page, text) for page, text in data["pages"]]
+
+
+def save_pages(cache_dir, content_hash, pages):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = artifact_path(cache_dir, content_hash)
+    data = {"extract_version": EXTRACT_VERSION, "pages": pages}
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(cache_dir, manifest):
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def prune_artifacts(cache_dir, manifest):
+    """Delete artifacts that no manifest entry points to any more."""
+    referenced = {entry["sha256"] for entry in manifest.values()}
+    for name in os.listdir(cache_dir):
+        if name.endswith(".json.gz") and name[:-len(".json.gz")] not in referenced:
+            os.remove(os.path.join(cache_dir, name))
+
+
+def iter_cached_documents(cache_dir):
+    """Yield (source_file, pages) for every manifest entry with a valid, current artifact."""
+    manifest = load_manifest(cache_dir)
+    for key in sorted(manifest):
+        entry = manifest[key]
+        if entry.get("stale"):
+            print(f"⚠️ Skipping {key}: the last S3 refresh failed, cached text may be outdated")
+            continue
+        pages = load_pages(cache_dir, entry["sha256"])
+        if pages is None:
+            print(f"⚠️ Missing cache artifact for {key}")
+            continue
+        yield entry["source_file"], pages
@@ -0,0 +1,212 @@
+# retrieval.py
+
+"""FAISS index and chunk metadata, loaded once and shared by the API.
+
+Loading happens on a background thread so the server can accept connections
+(and answer /healthz) while the index is read and prewarmed.
+
+Scoped searches (by document category, source file and page range) run on
+the main index with an ID selector, so distances are only computed for the
+chunks inside the scope and no second copy of the vectors is kept.
+"""
+
+import os
+import json
+import time
+import threading
+
+INDEX_FILE = "vector_index.faiss"
+METADATA_FILE = "metadata.json"
+LOAD_TIMEOUT = float(os.getenv("RETRIEVAL_LOAD_TIMEOUT", "120"))
+RETRY_BACKOFF = float(os.getenv("RETRIEVAL_RETRY_BACKOFF", "5"))
+RETRY_BACKOFF_MAX = 300
+
+# Explicit source_file -> category map, applied at ingestion; files not
+# listed get the default category
+CATEGORY_MAP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "document_categories.json")
+
+index = None
+metadata = None
+_category_map = None
+_pages = None
+_category_ids = {}
+_source_ids = {}
+
+_lock = threading.Lock()
+_done = threading.Event()
+_started = False
+_failures = 0
+_retry_at = 0.0
+_status = {"state": "idle", "error": None, "load_seconds": None, "prewarm_seconds": None, "prewarm_error": None}
+
+
+def load_category_map():
+    global _category_map
+    if _category_map is None:
+        with open(CATEGORY_MAP_FILE, "r", encoding="utf-8") as f:
+            _category_map = json.load(f)
+    return _category_map
+
+
+def get_categories():
+    return load_category_map()["categories"]
+
+
+def categorize_source(source_file):
+    category_map = load_category_map()
+    return category_map["source_files"].get(source_file, category_map["default_category"])
+
+
+def _build_scopes(loaded_metadata):
+    """Build the per-category, per-source and page lookup arrays used by scoped search."""
+    import numpy as np
+    global _pages, _category_ids, _source_ids
+    category_ids = {}
+    source_ids = {}
+    for i, chunk in enumerate(loaded_metadata):
+        # metadata.json built before categories existed has no "category" field
+        chunk.setdefault("category", categorize_source(chunk["source_file"]))
+        category_ids.setdefault(chunk["category"], []).append(i)
+        source_ids.setdefault(chunk["source_file"], []).append(i)
+
+    _pages = np.array([chunk.get("page", 0) for chunk in loaded_metadata], dtype="int64")
+    _category_ids = {category: np.array(ids, dtype="int64") for category, ids in category_ids.items()}
+    _source_ids = {source: np.array(ids, dtype="int64") for source, ids in source_ids.items()}
+
+
+def _prewarm(loaded_index):
+    """Touch the index once and pull in the OpenAI client so the first real
+    query doesn't pay for it. Failures here never block readiness."""
+    import numpy as np
+    start = time.perf_counter()
+    try:
+        if loaded_index.ntotal:
+            loaded_index.search(np.zeros((1, loaded_index.d), dtype="float32"), 1)
+        import openai  # noqa: F401
+    except Exception as e:
+        print(f"[WARN] Retrieval prewarm failed: {e}")
+        _status["prewarm_error"] = str(e)
+    _status["prewarm_seconds"] = round(time.perf_counter() - start, 3)
+
+
+def _load():
+    global index, metadata, _failures, _retry_at
+    try:
+        start = time.perf_counter()
+        import faiss
+        loaded_index = faiss.read_index(INDEX_FILE)
+        with open(METADATA_FILE, "r", encoding="utf-8") as f:
+            loaded_metadata = json.load(f)
+        _build_scopes(loaded_metadata)
+        _status["load_seconds"] = round(time.perf_counter() - start, 3)
+
+        _prewarm(loaded_index)
+
+        index, metadata = loaded_index, loaded_metadata
+        _failures = 0
+        _status["error"] = None
+        _status["state"] = "ready"
+    except Exception as e:
+        # Back off exponentially; the next start_loading() after _retry_at retries
+        _failures += 1
+        backoff = min(RETRY_BACKOFF * 2 ** (_failures - 1), RETRY_BACKOFF_MAX)
+        _retry_at = time.monotonic() + backoff
+        print(f"[ERROR] Retrieval load failed (attempt {_failures}, retrying in {backoff:g}s): {e}")
+        _status["state"] = "failed"
+        _status["error"] = str(e)
+    finally:
+        _done.set()
+
+
+def start_loading(background=True):
+    """Start loading the index once; later calls are no-ops unless the last
+    attempt failed and its backoff has elapsed."""
+    global _started
+    with _lock:
+        if _started and (_status["state"] != "failed" or time.monotonic() < _retry_at):
+            return
+        _started = True
+        _done.clear()
+        _status["state"] = "loading"
+    if background:
+        threading.Thread(target=_load, name="retrieval-loader", daemon=True).start()
+    else:
+        _load()
+
+
+def wait_until_ready(timeout=LOAD_TIMEOUT):
+    start_loading()
+    _done.wait(timeout)
+    return is_ready()
+
+
+def is_ready():
+    return _status["state"] == "ready"
+
+
+def get_status():
+    return dict(_status)
+
+
+def get_scopes():
+    """Categories and source files available for scoped search, with chunk counts."""
+    return {
+        "categories": {category: len(_category_ids.get(category, ())) for category in get_categories()},
+        "source_files": {source: len(ids) for source, ids in _source_ids.items()},
+    }
+
+
+def validate_scope(categories=None, source_files=None):
+    """Raise ValueError if a scope can never match: unknown categories or
+    source files, or categories with no documents indexed."""
+    if categories:
+        unknown = [category for category in categories if category not in get_categories()]
+        if unknown:
+            raise ValueError(f"Unknown categories: {', '.join(unknown)}")
+        if not any(category in _category_ids for category in categories):
+            raise ValueError(f"No documents are indexed for categories: {', '.join(categories)}")
+    if source_files:
+        unknown = [source for source in source_files if source not in _source_ids]
+        if unknown:
+            raise ValueError(f"Unknown source file(s): {', '.join(unknown)}")
+
+
+def _filter_ids(categories=None, source_files=None, page_min=None, page_max=None):
+    import numpy as np
+    validate_scope(categories, source_files)
+    ids = None
+    if categories:
+        ids = np.concatenate([_category_ids[category] for category in categories if category in _category_ids])
+    if source_files:
+        source_ids = np.concatenate([_source_ids[source] for source in source_files])
+        ids = source_ids if ids is None else np.intersect1d(ids, source_ids)
+    if ids is None:
+        ids = np.arange(len(metadata), dtype="int64")
+    if page_min is not None:
+        ids = ids[_pages[ids] >= page_min]
+    if page_max is not None:
+        ids = ids[_pages[ids] <= page_max]
+    return ids
+
+
+def search(query_vector, top_k=10, categories=None, source_files=None, page_min=None, page_max=None):
+    """Return the top_k nearest chunks, optionally restricted to a scope.
+
+    Raises ValueError for unknown categories or source files, and for
+    categories that have no documents indexed.
+    """
+    import faiss
+    import numpy as np
+    query = np.array([query_vector], dtype="float32")
+
+    params = None
+    if categories or source_files or page_min is not None or page_max is not None:
+        ids = _filter_ids(categories, source_files, page_min, page_max)
+        if not len(ids):
+            return []
+        selector = faiss.IDSelectorBatch(ids)
+        params = faiss.SearchParameters(sel=selector)
+        top_k = min(top_k, len(ids))
+
+    D, I = index.search(query, top_k, params=params)
+    return [metadata[i] for i in I[0] if 0 <= i < len(metadata)]
@@ -0,0 +1,86 @@
+# text_chunker.py
+
+"""Native recursive character splitter.
+
+Mirrors the separator semantics of LangChain's RecursiveCharacterTextSplitter
+(keep_separator=True, strip_whitespace=True, length measured with len) so the
+chunks it produces are identical, but works on plain str operations instead of
+per-call regex compilation and list re-slicing.
+"""
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", ".", "!", "?", ",", " ", ""]
+
+
+class NativeTextSplitter:
+    def __init__(self, chunk_size=500, chunk_overlap=150, separators=None):
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size}), should be smaller."
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators or DEFAULT_SEPARATORS)
+
+    def split_text(self, text):
+        return self._split_text(text, self.separators)
+
+    def _split_text(self, text, separators):
+        # Pick the first separator present in the text; "" always matches
+        separator = separators[-1]
+        new_separators = []
+        for i, sep in enumerate(separators):
+            if sep == "":
+                separator = sep
+                break
+            if sep in text:
+                separator = sep
+                new_separators = separators[i + 1:]
+                break
+
+        # Split keeping the separator at the start of each following piece
+        if separator:
+            pieces = text.split(separator)
+            splits = [pieces[0]] if pieces[0] else []
+            splits.extend(separator + p for p in pieces[1:])
+        else:
+            splits = list(text)
+
+        chunk_size = self.chunk_size
+        final_chunks = []
+        good_splits = []
+        for s in splits:
+            if len(s) < chunk_size:
+                good_splits.append(s)
+                continue
+            if good_splits:
+                final_chunks.extend(self._merge_splits(good_splits))
+                good_splits = []
+            if new_separators:
+                final_chunks.extend(self._split_text(s, new_separators))
+            else:
+                final_chunks.append(s)
+        if good_splits:
+            final_chunks.extend(self._merge_splits(good_splits))
+        return final_chunks
+
+    def _merge_splits(self, splits):
+        # Separators are already attached to the splits, so they join with ""
+        chunk_size = self.chunk_size
+        chunk_overlap = self.chunk_overlap
+        docs = []
+        start = 0
+        total = 0
+        for end, piece in enumerate(splits):
+            size = len(piece)
+            if total + size > chunk_size and end > start:
+                doc = "".join(splits[start:end]).strip()
+                if doc:
+                    docs.append(doc)
+                while total > chunk_overlap or (total + size > chunk_size and total > 0):
+                    total -= len(splits[start])
+                    start += 1
+            total += size
+        doc = "".join(splits[start:]).strip()
+        if doc:
+            docs.append(doc)
+        return docs